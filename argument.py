@@ -0,0 +1,75 @@
+from threading import Lock as _Lock
+from weakref import WeakValueDictionary as _WeakValueDictionary
+from . import Rule, Argument
+
+class CompactArgument:
+    """
+    An immutable, hashable Argument.
+
+    A CompactArgument is either a fact (a Predicate concluding itself) or a
+    Rule applied to one sub-argument for each of the rule's predicates.
+    CompactArguments are interned: constructing an argument that already
+    exists returns the existing object. Sub-arguments are therefore shared
+    between every argument built on them instead of being copied, equality
+    is identity and the hash is computed once on construction.
+    """
+
+    __slots__ = ('conclusion', 'rule', 'subarguments', '_hash', '__weakref__')
+
+    _interned = _WeakValueDictionary()
+    _interning = _Lock()
+
+    def __new__(cls, conclusion, rule=None, subarguments=()):
+        """
+        Takes a conclusion, the Rule concluding it (None for facts) and the
+        CompactArguments for the predicates of the rule
+        """
+        if rule is not None:
+            rule = Rule(tuple(rule.predicates), tuple(rule.conclusions))
+        subarguments = tuple(subarguments)
+        key = (conclusion, rule, subarguments)
+        with cls._interning:
+            self = cls._interned.get(key)
+            if self is None:
+                self = object.__new__(cls)
+                object.__setattr__(self, 'conclusion', conclusion)
+                object.__setattr__(self, 'rule', rule)
+                object.__setattr__(self, 'subarguments', subarguments)
+                object.__setattr__(self, '_hash', hash(key))
+                cls._interned[key] = self
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompactArgument is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompactArgument is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        """Unpickled arguments are interned again"""
+        return (CompactArgument, (self.conclusion, self.rule, self.subarguments))
+
+    def __repr__(self):
+        if self.rule is None:
+            return "CompactArgument(%r)" % (self.conclusion,)
+        return "CompactArgument(%r, %r, %r)" % (self.conclusion, self.rule,
+                self.subarguments)
+
+    @property
+    def predicates(self):
+        """The predicates and rules of the argument, in the same order as the
+        predicates of an Argument"""
+        if self.rule is None:
+            return (self.conclusion,)
+        retval = [self.rule]
+        for subargument in self.subarguments:
+            retval += subargument.predicates
+        return tuple(retval)
+
+    def as_argument(self):
+        """Returns the equivalent Argument, its rules hold tuples instead of
+        lists"""
+        return Argument(list(self.predicates), self.conclusion)
@@ -1,6 +1,20 @@
 from . import Belief, Rule, Predicate
 from .framework import ArgumentationFramework
+from .knowledgebase import KnowledgeBase, complement, find_attacks
+from .strength import strengths as _strengths, defeats as _defeats
 from collections import namedtuple as _namedtuple
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+
+# The view an agent has of a BeliefBase: the agents it trusts mapped to how
+# much it trusts them and the KnowledgeBase of their beliefs
+AgentView = _namedtuple('AgentView', ['trust', 'knowledgebase'])
+
+def _hashable(predicate):
+    """Returns predicate, with the lists of Rules turned into tuples"""
+    if type(predicate) is Rule:
+        return Rule(tuple(predicate.predicates), tuple(predicate.conclusions))
+    return predicate
 
 
 class BeliefBase:
@@ -13,8 +27,155 @@ class BeliefBase:
         assert all([type(x) is Belief for x in beliefs])
         self._sn = sn
         self._beliefs = beliefs
+        self._by_agent = dict()
+        self._by_predicate = dict()
+        for belief in beliefs:
+            self._by_agent.setdefault(belief.agent, []).append(belief)
+            self._by_predicate.setdefault(_hashable(belief.predicate),
+                    []).append(belief)
+        self._views = dict()
+        # contents -> KnowledgeBase, shared between agents with the same view
+        self._knowledgebases = dict()
+
+    def beliefs_of(self, agent):
+        """Returns the beliefs held by agent"""
+        return list(self._by_agent.get(agent, []))
+
+    def believers(self, predicate):
+        """Returns the beliefs in predicate (a Predicate or Rule)"""
+        return list(self._by_predicate.get(_hashable(predicate), []))
 
+    def agent_view(self, who):
+        """
+        Returns the AgentView of who: every agent who trusts (who itself
+        fully) mapped to the trust who has in it, and the KnowledgeBase made
+        of their beliefs. Views are cached per agent.
+        """
+        if who in self._views:
+            return self._views[who]
+        if who not in self._sn:
+            raise ValueError("No such agent in social network")
+        trust = {who: 1.0} # MAX TRUST
+        for agent in self._sn.reachable(who):
+            # trust edges may lead out of the network, to non agents
+            if agent != who and agent in self._sn:
+                level = self._sn.trusts(who, agent)
+                if level > 0:
+                    trust[agent] = level
+        predicates = dict() # ordered set
+        for agent in trust:
+            for belief in self._by_agent.get(agent, []):
+                predicates[_hashable(belief.predicate)] = None
+        knowledgebase = self._knowledgebases.get(frozenset(predicates))
+        if knowledgebase is None:
+            knowledgebase = self._knowledgebases.setdefault(
+                    frozenset(predicates), KnowledgeBase(list(predicates)))
+        view = AgentView(trust, knowledgebase)
+        self._views[who] = view
+        return view
 
-    def query(self, who, query):
+    def strengths(self, who, arguments):
+        """Returns a dictionary from arguments to their strength for who.
+        See strength.strengths"""
+        arguments = list(arguments)
+        trust = self.agent_view(who).trust
+        beliefs = [Belief(x.agent, _hashable(x.predicate), x.level)
+                for agent in trust for x in self._by_agent.get(agent, [])]
+        return dict(zip(arguments, _strengths(arguments, beliefs, trust)))
+
+    def _effective_beliefs(self, who):
+        """Returns the beliefs who relies on, with levels capped by the trust
+        who has in their holders"""
+        trust = self.agent_view(who).trust
+        return frozenset((_hashable(x.predicate), min(x.level, trust[agent]))
+                for agent in trust for x in self._by_agent.get(agent, []))
+
+    def query(self, who, query, preferences=False):
         """Given an agent in the socialnetwork and a query (a predicate)
-        returns an argumentation framework that 
+        returns an argumentation framework that holds the arguments for and
+        against the query that can be constructed from the beliefs of the
+        agents who trusts.
+        If preferences is True only keeps the attacks that are defeats
+        according to the strengths of the arguments for who.
+        """
+        return self._framework(who, [query, complement(query)], preferences)
+
+    def _framework(self, who, conclusions, preferences):
+        """Builds the argumentation framework for conclusions from the view
+        of who"""
+        arguments = self.agent_view(who).knowledgebase.closure_arguments(
+                conclusions)
+        attacks = find_attacks(arguments)
+        if preferences:
+            attacks = _defeats(attacks, self.strengths(who, arguments))
+        return ArgumentationFramework(arguments, attacks)
+
+    def _view_key(self, who, preferences):
+        """Returns a key that is equal for agents whose frameworks are bound
+        to be identical: the same KnowledgeBase and, if preferences is True,
+        the same beliefs at the same trust-capped levels"""
+        trust = self.agent_view(who).trust
+        contents = frozenset(_hashable(x.predicate)
+                for agent in trust for x in self._by_agent.get(agent, []))
+        if preferences:
+            return (contents, self._effective_beliefs(who))
+        return (contents,)
+
+    def _labelling(self, who, conclusions, preferences):
+        """Returns the grounded Labelling of the framework for conclusions
+        from the view of who"""
+        af = self._framework(who, conclusions, preferences)
+        return af.get_labelling(af.grounded_extension())
+
+    def query_many(self, agents, queries, workers=1, preferences=False,
+            processes=False):
+        """
+        Answers queries (a list of predicates) for every agent in agents.
+        Returns a dictionary from agents to the grounded Labelling of the
+        argumentation framework for all queries, built as in query.
+
+        Agents whose frameworks are bound to be identical share a single
+        computation. The agent views and the frameworks are computed by a
+        pool of workers. By default these are threads, which share the
+        caches of the BeliefBase but, the work being pure python, only
+        overlap and do not run in parallel. If processes is True they are
+        processes, which run in parallel and receive a copy of the
+        BeliefBase once each (the BeliefBase must be picklable, so its
+        SocialNetwork cannot use lambdas as operators). The caches they fill
+        are not seen by the BeliefBase.
+        """
+        agents = list(agents)
+        conclusions = []
+        for query in queries:
+            conclusions += [query, complement(query)]
+
+        if processes:
+            pool = _ProcessPoolExecutor(max_workers=workers,
+                    initializer=_init_worker, initargs=(self,))
+            key, label = _worker_view_key, _worker_labelling
+        else:
+            pool = _ThreadPoolExecutor(max_workers=workers)
+            key, label = self._view_key, self._labelling
+        with pool:
+            keys = list(pool.map(key, agents, [preferences] * len(agents)))
+            representatives = dict() # key -> first agent with that key
+            for who, k in zip(agents, keys):
+                representatives.setdefault(k, who)
+            labellings = dict(zip(representatives,
+                pool.map(label, representatives.values(),
+                    [conclusions] * len(representatives),
+                    [preferences] * len(representatives))))
+        return {who: labellings[k] for who, k in zip(agents, keys)}
+
+# The BeliefBase of a query_many worker process
+_worker = None
+
+def _init_worker(bb):
+    global _worker
+    _worker = bb
+
+def _worker_view_key(who, preferences):
+    return _worker._view_key(who, preferences)
+
+def _worker_labelling(who, conclusions, preferences):
+    return _worker._labelling(who, conclusions, preferences)
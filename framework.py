@@ -4,6 +4,10 @@ try:
     import pydot
 except ImportError:
     print ("Unable to import pydot. pydot support not enabled")
+try:
+    import numpy as _np
+except ImportError:
+    print ("Unable to import numpy. Gradual semantics not enabled")
 
 # the labelling "in" is illegal in python because 'in' is a reserved keyword in
 # python
@@ -219,6 +223,60 @@ class ArgumentationFramework:
 
         return retval
 
+    def _gradual(self, aggregate, weights, tol, max_iter):
+        """
+        Iterates s(A) = w(A) / (1 + aggregate of s(B) for B in A-) from
+        s = w until no score changes by more than tol. The attacks are kept
+        as two index arrays (a sparse matrix in coordinate form) so every
+        iteration is linear in the amount of attacks.
+        Raises RuntimeError if there is no convergence within max_iter
+        iterations, raise tol or max_iter then.
+        """
+        Ar = list(self._Ar)
+        index = {x: i for i, x in enumerate(Ar)}
+        if weights is None:
+            weights = dict()
+        w = _np.array([weights.get(x, 1.0) for x in Ar], dtype=float)
+        attackers = _np.array([index[x.attacker] for x in self._df],
+                dtype=_np.intp)
+        attacked = _np.array([index[x.attacked] for x in self._df],
+                dtype=_np.intp)
+        scores = w.copy()
+        for i in range(max_iter):
+            new = w / (1.0 + aggregate(scores[attackers], attacked, len(Ar)))
+            if len(Ar) == 0 or _np.max(_np.abs(new - scores)) <= tol:
+                return dict(zip(Ar, new.tolist()))
+            scores = new
+        raise RuntimeError(
+                "Gradual semantics did not converge in %d iterations" %
+                max_iter)
+
+    def h_categorizer(self, weights=None, tol=1e-9, max_iter=10000):
+        """
+        Weighted h-categorizer semantics
+        s(A) = w(A) / (1 + sum of s(B) for B in A-)
+        Returns a dictionary from arguments to their score between 0 and
+        their weight. weights is an optional dictionary from arguments to
+        their weight (default 1.0), such as BeliefBase.strengths.
+        """
+        def aggregate(values, attacked, n):
+            return _np.bincount(attacked, weights=values, minlength=n)
+        return self._gradual(aggregate, weights, tol, max_iter)
+
+    def max_based(self, weights=None, tol=1e-9, max_iter=10000):
+        """
+        Weighted max-based semantics
+        s(A) = w(A) / (1 + max of s(B) for B in A-)
+        Returns a dictionary from arguments to their score between 0 and
+        their weight. weights is an optional dictionary from arguments to
+        their weight (default 1.0), such as BeliefBase.strengths.
+        """
+        def aggregate(values, attacked, n):
+            retval = _np.zeros(n)
+            _np.maximum.at(retval, attacked, values)
+            return retval
+        return self._gradual(aggregate, weights, tol, max_iter)
+
     def print_dot_graph(self, path, Args=set()):
         """Prints the framework to a file.
         Writes using extension for type of file to write.
@@ -265,3 +323,13 @@ class ArgumentationFramework:
             print("Could not print")
 
         return
+
+# Names of the semantics of an ArgumentationFramework mapped to functions
+# returning their extensions
+SEMANTICS = {
+    'complete': lambda af: af.complete_extension(),
+    'grounded': lambda af: [af.grounded_extension()],
+    'preferred': lambda af: af.preferred_extension(),
+    'semistable': lambda af: af.semistable_extension(),
+    'stable': lambda af: af.stable_extension(),
+}
@@ -1,11 +1,68 @@
-from . import Belief, Rule, Predicate, Argument
+from . import Belief, Rule, Predicate, Argument, Attack
 from .framework import ArgumentationFramework
+from .argument import CompactArgument
+from itertools import islice as _islice
 import operator
 
 # Predicate = _namedtuple('Predicate', ['predicate', 'true'])
 # Rule = _namedtuple('Rule', ['predicates', 'conclusions'])
 # Argument = _namedtuple('Argument', ['predicates', 'conclusion'])
 
+def complement(predicate):
+    """Returns the Predicate that contradicts predicate"""
+    return Predicate(predicate.predicate, not predicate.true)
+
+def freeze(argument):
+    """Returns a hashable copy of argument, so that it can be used as an
+    argument of an ArgumentationFramework. CompactArguments are returned
+    as they are"""
+    if type(argument) is not Argument:
+        return argument
+    predicates = tuple(Rule(tuple(x.predicates), tuple(x.conclusions))
+            if type(x) is Rule else x for x in argument.predicates)
+    return Argument(predicates, argument.conclusion)
+
+def claims(argument):
+    """Returns every Predicate argument relies on or concludes: its
+    premises, the conclusions of its rules and its own conclusion"""
+    retval = {argument.conclusion}
+    for x in argument.predicates:
+        if type(x) is Rule:
+            retval.update(x.conclusions)
+        else:
+            retval.add(x)
+    return retval
+
+def find_attacks(arguments):
+    """
+    Returns the set of Attacks between arguments.
+    A attacks B iff the conclusion of A contradicts the conclusion of B
+    (rebuttal) or any premise or intermediate conclusion of B (undercut).
+    Arguments are indexed by their claims so that each argument only looks
+    up the arguments it attacks instead of comparing every pair.
+    """
+    index = dict()
+    for argument in arguments:
+        for claim in claims(argument):
+            index.setdefault(claim, []).append(argument)
+    return {Attack(attacker, attacked) for attacker in arguments
+            for attacked in index.get(complement(attacker.conclusion), [])}
+
+def build_framework(arguments):
+    """Returns the ArgumentationFramework of arguments and the attacks
+    between them"""
+    arguments = {freeze(x) for x in arguments}
+    return ArgumentationFramework(arguments, find_attacks(arguments))
+
+def given_rules(rules):
+    """Returns a dictionary from each rule as CompactArguments hold it,
+    with tuples for predicates and conclusions, to the rule as given"""
+    retval = dict()
+    for rule in rules:
+        retval.setdefault(Rule(tuple(rule.predicates), tuple(rule.conclusions)),
+                rule)
+    return retval
+
 class KnowledgeBase:
     """
     Data structure that holds a sequence of Predicates and Rules and can
@@ -18,6 +75,13 @@ class KnowledgeBase:
         """
         self._predicates = [x for x in beliefs if type(x) is Predicate]
         self._rules = [x for x in beliefs if type(x) is Rule]
+        # conclusion -> rules that conclude it
+        self._concluding = dict()
+        # rule as held by CompactArguments -> rule as given
+        self._given = given_rules(self._rules)
+        for rule in self._rules:
+            for conclusion in rule.conclusions:
+                self._concluding.setdefault(conclusion, []).append(rule)
 
     def __init(self, predicates, rules):
         self._predicates = [x for x in predicates if type(x) is Predicate]
@@ -49,3 +113,89 @@ class KnowledgeBase:
                 arguments.append(Argument(predicates, conclusion))
 
         return arguments
+
+    def iter_arguments(self, conclusion, max_depth=None, limit=None):
+        """
+        Lazily yields every Argument with said conclusion.
+
+        Unlike construct_argument every alternative derivation is yielded as
+        its own Argument, one per rule concluding conclusion and per
+        combination of the arguments for that rule's predicates. A
+        conclusion is never used to derive itself, rules are chained at most
+        max_depth deep and at most limit Arguments are yielded. The rules of
+        the Arguments are the ones the KnowledgeBase was given.
+        """
+        for argument in self.iter_compact_arguments(conclusion, max_depth,
+                limit):
+            yield Argument([self._given.get(x, x) for x in argument.predicates],
+                    conclusion)
+
+    def iter_compact_arguments(self, conclusion, max_depth=None, limit=None):
+        """Same as iter_arguments but yields CompactArguments"""
+        generator = self._iter_arguments(conclusion, max_depth, frozenset())
+        if limit is not None:
+            generator = _islice(generator, limit)
+        return generator
+
+    def _iter_arguments(self, conclusion, depth, path):
+        """Generator behind iter_compact_arguments, path holds the
+        conclusions being derived on the way to conclusion"""
+        if conclusion in self._predicates:
+            # Singular argument, no need for inferences
+            yield CompactArgument(conclusion)
+            return
+        if depth == 0 or conclusion in path:
+            return
+        if depth is not None:
+            depth -= 1
+        path = path.union([conclusion])
+        for rule in self._concluding.get(conclusion, []):
+            for subarguments in self._combine(rule.predicates, depth, path):
+                yield CompactArgument(conclusion, rule, subarguments)
+
+    def _combine(self, premises, depth, path):
+        """Yields every combination of arguments for premises"""
+        if len(premises) == 0:
+            yield ()
+            return
+        for first in self._iter_arguments(premises[0], depth, path):
+            for rest in self._combine(premises[1:], depth, path):
+                yield (first,) + rest
+
+    def closure_arguments(self, conclusions=None, max_depth=None,
+            limit=None):
+        """
+        Returns the set of CompactArguments for conclusions, their
+        sub-arguments and every argument that attacks them, directly or
+        indirectly. If conclusions is None constructs the arguments for
+        everything in the KnowledgeBase. max_depth and limit are passed on
+        to iter_arguments for every conclusion.
+        """
+        if conclusions is None:
+            conclusions = self._predicates + list(self._concluding)
+        pending = list(conclusions)
+        closed = set()
+        arguments = set()
+        while len(pending) != 0:
+            conclusion = pending.pop()
+            if conclusion in closed:
+                continue
+            closed.add(conclusion)
+            for argument in self.iter_compact_arguments(conclusion, max_depth,
+                    limit):
+                pending += [complement(x) for x in claims(argument)]
+                # Sub-arguments can be attacked on their own
+                stack = [argument]
+                while len(stack) != 0:
+                    argument = stack.pop()
+                    if argument not in arguments:
+                        arguments.add(argument)
+                        stack += argument.subarguments
+        return arguments
+
+    def argumentation_framework(self, conclusions=None, max_depth=None,
+            limit=None):
+        """Returns the ArgumentationFramework of closure_arguments and the
+        attacks between them"""
+        return build_framework(self.closure_arguments(conclusions,
+            max_depth, limit))
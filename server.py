@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor as _ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from . import Predicate, Rule, Belief
+from .beliefbase import BeliefBase
+from .framework import SEMANTICS
+
+# Requests are JSON objects, one per line, with an "op" and its arguments:
+# --> {"op": "trust", "truster": a, "trustee": b}
+# --> {"op": "query", "agent": a, "query": [name, true], "preferences": false}
+#     answers the grounded labelling of the query
+# --> {"op": "extension", "agent": a, "query": [name, true],
+#      "semantics": "preferred", "preferences": false}
+# Every request is answered by a line with {"result": ...} or {"error": ...}
+# Arguments are sent as their repr.
+
+def _names(Args):
+    return sorted(repr(x) for x in Args)
+
+def answer(sn, bb, request):
+    """Answers request with the socialnetwork sn and its BeliefBase bb,
+    blocking"""
+    op = request.get('op')
+    if op == 'trust':
+        truster, trustee = request['truster'], request['trustee']
+        if truster not in sn or trustee not in sn:
+            raise ValueError("No such agent in social network")
+        return sn.trusts(truster, trustee)
+    if op not in ('query', 'extension'):
+        raise ValueError("Unknown op %s" % op)
+    query = Predicate(*request['query'])
+    af = bb.query(request['agent'], query, request.get('preferences', False))
+    if op == 'query':
+        labelling = af.get_labelling(af.grounded_extension())
+        return {'in': _names(labelling.inside),
+                'out': _names(labelling.outside),
+                'undecided': _names(labelling.undecided)}
+    semantics = SEMANTICS[request.get('semantics', 'grounded')]
+    return [_names(x) for x in semantics(af)]
+
+# The socialnetwork and BeliefBase of a process of a process pool
+_worker = None
+
+def _init_worker(sn, bb):
+    global _worker
+    _worker = (sn, bb)
+
+def _worker_compute(request):
+    return answer(*_worker, request)
+
+class QueryServer:
+    """
+    Serves a BeliefBase over TCP on localhost so that it is only loaded
+    once. Concurrent identical requests are coalesced into a single
+    computation and computations run in an executor, away from the event
+    loop. The default executor is a thread pool so that computations share
+    the caches of the BeliefBase. If processes is True computations run in
+    a process pool instead, each process with its own copy of the
+    BeliefBase.
+    """
+
+    def __init__(self, sn, beliefs, executor=None, processes=False):
+        """Takes a socialnetwork, a set/list of beliefs and optionally the
+        thread pool to compute answers with. Process pools have to be set
+        up with the BeliefBase, so they are made by the server when
+        processes is True."""
+        if executor is not None and processes:
+            raise ValueError("executor and processes are exclusive")
+        if not isinstance(executor, (type(None), _ThreadPoolExecutor)):
+            raise TypeError("executor has to be a ThreadPoolExecutor")
+        self._sn = sn
+        self._bb = BeliefBase(sn, beliefs)
+        self._owns_executor = executor is None
+        if processes:
+            self._executor = _ProcessPoolExecutor(initializer=_init_worker,
+                    initargs=(self._sn, self._bb))
+            self._compute = _worker_compute
+        else:
+            self._executor = executor or _ThreadPoolExecutor()
+            self._compute = self.compute
+        self._pending = dict() # request -> future of its answer
+        self._server = None
+        self.computations = 0
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Starts listening, returns the (host, port) listened on"""
+        self._server = await asyncio.start_server(self._client, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stops listening and shuts down the executor if the server made
+        it"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    async def _client(self, reader, writer):
+        """Answers the requests of a connection in order"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = {'result': await self.handle(json.loads(line))}
+                except Exception as e:
+                    response = {'error': "%s: %s" % (type(e).__name__, e)}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle(self, request):
+        """Returns the answer to request, sharing the computation with any
+        identical request being answered"""
+        key = json.dumps(request, sort_keys=True)
+        future = self._pending.get(key)
+        if future is None:
+            # Only the event loop counts, so no lock is needed
+            self.computations += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, self._compute,
+                    request)
+            self._pending[key] = future
+            future.add_done_callback(lambda f: self._pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    def compute(self, request):
+        """Answers request, blocking"""
+        return answer(self._sn, self._bb, request)
+
+
+async def load(host, port, requests, concurrency=8):
+    """
+    Load generator. Sends requests (a list of request dictionaries) to the
+    server at host:port over concurrency connections and returns a
+    dictionary with the throughput in requests per second, the latency
+    percentiles in seconds and the amount of errors.
+    """
+    latencies = []
+    errors = 0
+
+    async def connection(share):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        for request in share:
+            start = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b'\n')
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if 'error' in response:
+                errors += 1
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[connection(requests[i::concurrency])
+        for i in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    def percentile(p):
+        if len(latencies) == 0:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+    return {'requests': len(latencies), 'errors': errors,
+            'throughput': len(latencies) / elapsed if elapsed else 0.0,
+            'p50': percentile(0.5), 'p90': percentile(0.9),
+            'p99': percentile(0.99), 'max': percentile(1.0)}
+
+def benchmark(sn, beliefs, requests, concurrency=8):
+    """Starts a QueryServer on localhost, runs load against it and returns
+    the statistics"""
+    async def run():
+        server = QueryServer(sn, beliefs)
+        host, port = await server.start()
+        try:
+            return await load(host, port, requests, concurrency)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+def read_beliefs(path):
+    """
+    Reads beliefs from a JSON file holding a list of [agent, belief, level]
+    where belief is either a predicate, [name, true], or a rule,
+    {"predicates": [predicates], "conclusions": [predicates]}
+    """
+    with open(path) as f:
+        retval = []
+        for agent, belief, level in json.load(f):
+            if type(belief) is dict:
+                belief = Rule(tuple(Predicate(*x) for x in belief['predicates']),
+                        tuple(Predicate(*x) for x in belief['conclusions']))
+            else:
+                belief = Predicate(*belief)
+            retval.append(Belief(agent, belief, level))
+        return retval
+
+def main(argv=None):
+    """Serves the SocialNetwork of a snapshot (see snapshot.save) and the
+    beliefs of a JSON file (see read_beliefs) until interrupted"""
+    from .snapshot import load as load_snapshot
+    parser = argparse.ArgumentParser(prog='python -m argtrust.server',
+            description=main.__doc__)
+    parser.add_argument('snapshot')
+    parser.add_argument('beliefs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8462)
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = QueryServer(load_snapshot(args.snapshot).socialnetwork,
+                read_beliefs(args.beliefs))
+        host, port = await server.start(args.host, args.port)
+        print("Serving on %s:%d" % (host, port))
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
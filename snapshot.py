@@ -0,0 +1,425 @@
+import mmap as _mmap
+import pickle as _pickle
+import struct as _struct
+from collections import namedtuple as _namedtuple
+from collections.abc import Mapping as _Mapping
+from functools import cached_property as _cached_property
+import numpy as _np
+from . import Trust, Attack
+from .socialnetwork import SocialNetwork, _ordered
+from .knowledgebase import KnowledgeBase, given_rules
+from .framework import ArgumentationFramework, SEMANTICS
+
+# A snapshot file is laid out as:
+# --> MAGIC, the format version and the length of the header
+# --> The header, a small pickled dictionary with the offsets, types and
+#     shapes of the arrays and the remaining settings
+# --> The arrays, aligned to ALIGNMENT bytes, memory mapped when loading.
+#     Each of the network, the knowledge base and the framework has its own
+#     symbol table (its agents, predicates, rules or arguments, each stored
+#     once and referred to by their index) pickled into a byte array.
+# The trust relations are stored in compressed sparse row form: the agents
+# trusted by agent i are trust.trusted[trust.indptr[i]:trust.indptr[i+1]],
+# sorted. Loading builds nothing but the header; symbol tables, sets and
+# dictionaries are built the first time something needs them.
+# Loading unpickles, only load snapshots you trust.
+
+MAGIC = b'ARGTRUST'
+VERSION = 2
+ALIGNMENT = 64
+_PREFIX = _struct.Struct('<8sIQ')
+
+Snapshot = _namedtuple('Snapshot',
+        ['socialnetwork', 'knowledgebase', 'framework', 'semantics'])
+
+class MalformedSnapshot(Exception):
+    pass
+
+
+class _TrustMatrix:
+    """The trust cache of a loaded SocialNetwork: a memory mapped matrix of
+    trust values and a dictionary for new values"""
+
+    def __init__(self, sn, matrix):
+        self._sn = sn
+        self._matrix = matrix
+        self._extra = dict()
+
+    def __contains__(self, key):
+        return True
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        ids = self._sn._ids
+        return float(self._matrix[ids[key[0]], ids[key[1]]])
+
+    def __setitem__(self, key, value):
+        self._extra[key] = value
+
+
+class _Links(_Mapping):
+    """The trust values of a mapped SocialNetwork, (truster, trusted) ->
+    value, looked up in its arrays"""
+
+    def __init__(self, sn):
+        self._sn = sn
+
+    def _edge(self, key):
+        ids = self._sn._ids
+        if key[0] not in ids or key[1] not in ids:
+            return None
+        start, stop = self._sn._row(ids[key[0]])
+        j = ids[key[1]]
+        k = start + int(_np.searchsorted(self._sn._trusted_ids[start:stop], j))
+        if k < stop and self._sn._trusted_ids[k] == j:
+            return k
+        return None
+
+    def __getitem__(self, key):
+        k = self._edge(key)
+        if k is None:
+            raise KeyError(key)
+        return float(self._sn._values[k])
+
+    def __contains__(self, key):
+        return self._edge(key) is not None
+
+    def __iter__(self):
+        agents = self._sn._agents
+        for i in range(len(agents)):
+            start, stop = self._sn._row(i)
+            for j in self._sn._trusted_ids[start:stop].tolist():
+                yield Trust(agents[i], agents[j])
+
+    def __len__(self):
+        return len(self._sn._trusted_ids)
+
+
+class _MappedSocialNetwork(SocialNetwork):
+    """A SocialNetwork backed by the arrays of a snapshot"""
+
+    def __init__(self, section, size, indptr, trusted, values, operators):
+        self._section = section
+        # The symbols after the first size are only mentioned in trust
+        # relations, they are not agents of the network
+        self._size = size
+        self._indptr = indptr
+        self._trusted_ids = trusted
+        self._values = values
+        self._transitive_operator, self._paths_operator = operators
+        self._trust_cache = dict()
+
+    @_cached_property
+    def _agents(self):
+        return _pickle.loads(self._section)
+
+    @_cached_property
+    def _ids(self):
+        return {x: i for i, x in enumerate(self._agents)}
+
+    @_cached_property
+    def _Ags(self):
+        return set(self._agents[:self._size])
+
+    @_cached_property
+    def _tr(self):
+        return _Links(self)
+
+    @_cached_property
+    def _tau(self):
+        return set(self._tr)
+
+    @_cached_property
+    def _trusted(self):
+        return {self._agents[i]: [self._agents[j] for j in
+            self._trusted_ids[slice(*self._row(i))].tolist()]
+            for i in range(len(self._indptr) - 1)}
+
+    def _row(self, i):
+        return int(self._indptr[i]), int(self._indptr[i+1])
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, agent):
+        return self._ids.get(agent, self._size) < self._size
+
+    def _links(self, source, closed):
+        agents = self._agents
+        return _ordered({agents[j] for j in
+                self._trusted_ids[slice(*self._row(self._ids[source]))].tolist()
+                if agents[j] not in closed})
+
+    def _reachable_ids(self, agent):
+        seen = _np.zeros(len(self._indptr) - 1, dtype=bool)
+        i = self._ids[agent]
+        seen[i] = True
+        pending = [i]
+        while len(pending) != 0:
+            successors = self._trusted_ids[slice(*self._row(pending.pop()))]
+            new = successors[~seen[successors]]
+            seen[new] = True
+            pending += new.tolist()
+        return seen
+
+    def reachable(self, agent):
+        if agent not in self._ids:
+            return {agent}
+        agents = self._agents
+        return {agents[i] for i in _np.flatnonzero(self._reachable_ids(agent))}
+
+    def agent_centric(self, agent):
+        if agent not in self:
+            raise ValueError("No such agent in social network")
+        seen = self._reachable_ids(agent)
+        seen[self._size:] = False
+        trusters = _np.repeat(_np.arange(len(seen)), _np.diff(self._indptr))
+        kept = _np.flatnonzero(seen[trusters] & seen[self._trusted_ids])
+        agents = self._agents
+        tau = [(agents[i], agents[j], v) for i, j, v in
+                zip(trusters[kept].tolist(), self._trusted_ids[kept].tolist(),
+                    self._values[kept].tolist())]
+        return SocialNetwork([agents[i] for i in _np.flatnonzero(seen)], tau,
+                self._transitive_operator, self._paths_operator)
+
+
+class _MappedKnowledgeBase(KnowledgeBase):
+    """A KnowledgeBase backed by the arrays of a snapshot"""
+
+    def __init__(self, section, predicates, rules, conclusions, concluding):
+        self._section = section
+        self._predicate_ids = predicates
+        self._rule_ids = rules
+        self._conclusion_ids = conclusions
+        self._concluding_ids = concluding
+
+    @_cached_property
+    def _symbols(self):
+        return _pickle.loads(self._section)
+
+    @_cached_property
+    def _predicates(self):
+        return [self._symbols[i] for i in self._predicate_ids.tolist()]
+
+    @_cached_property
+    def _rules(self):
+        return [self._symbols[i] for i in self._rule_ids.tolist()]
+
+    @_cached_property
+    def _concluding(self):
+        retval = dict()
+        for x, y in zip(self._conclusion_ids.tolist(),
+                self._concluding_ids.tolist()):
+            retval.setdefault(self._symbols[x], []).append(self._symbols[y])
+        return retval
+
+    @_cached_property
+    def _given(self):
+        return given_rules(self._rules)
+
+
+class _MappedArgumentationFramework(ArgumentationFramework):
+    """An ArgumentationFramework backed by the arrays of a snapshot, its
+    symbol table holds its arguments"""
+
+    def __init__(self, section, size, attackers, attacked):
+        self._section = section
+        self._size = size
+        self._attackers = attackers
+        self._attacked = attacked
+
+    @_cached_property
+    def _symbols(self):
+        return _pickle.loads(self._section)
+
+    @_cached_property
+    def _Ar(self):
+        return set(self._symbols)
+
+    @_cached_property
+    def _df(self):
+        symbols = self._symbols
+        return {Attack(symbols[x], symbols[y]) for x, y in
+                zip(self._attackers.tolist(), self._attacked.tolist())}
+
+    def __len__(self):
+        return self._size
+
+
+class _Semantics(_Mapping):
+    """The saved extensions of a mapped framework, semantics name -> list of
+    sets of arguments, built when asked for"""
+
+    def __init__(self, af, arrays, names):
+        self._af = af
+        self._arrays = arrays
+        self._names = names
+        self._cache = dict()
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        if name not in self._cache:
+            symbols = self._af._symbols
+            members = self._arrays['semantics.' + name].tolist()
+            offsets = self._arrays['semantics.' + name + '.offsets'].tolist()
+            self._cache[name] = [{symbols[i] for i in members[x:y]}
+                    for x, y in zip(offsets, offsets[1:])]
+        return self._cache[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+class _Symbols:
+    """Interns the symbols of one section of a snapshot"""
+
+    def __init__(self):
+        self.symbols = []
+        self.ids = dict()
+
+    def intern(self, x):
+        try:
+            if x in self.ids:
+                return self.ids[x]
+            self.ids[x] = len(self.symbols)
+        except TypeError: # Rules holding lists are stored once per use
+            pass
+        self.symbols.append(x)
+        return len(self.symbols) - 1
+
+    def indices(self, xs):
+        return _np.array([self.intern(x) for x in xs], dtype=_np.int64)
+
+    def pickled(self):
+        return _np.frombuffer(_pickle.dumps(self.symbols,
+            protocol=_pickle.HIGHEST_PROTOCOL), dtype=_np.uint8)
+
+
+def save(path, sn=None, kb=None, af=None, trust=False, semantics=()):
+    """
+    Writes a snapshot of a SocialNetwork, a KnowledgeBase and an
+    ArgumentationFramework, any of which may be None, to path.
+    If trust is True the trust of every agent in every other agent is
+    computed and saved with the SocialNetwork, which takes a search of the
+    network for every pair of agents connected by trust. semantics is a list of names
+    of semantics (see framework.SEMANTICS) whose extensions are computed
+    and saved with the ArgumentationFramework.
+    """
+    arrays = dict()
+    settings = {'sn': sn is not None, 'kb': kb is not None,
+            'af': af is not None, 'semantics': list(semantics)}
+    if sn is not None:
+        agents = _Symbols()
+        size = len(agents.indices(sn))
+        links = list(sn._tr)
+        trusters = agents.indices([x[0] for x in links])
+        trusted = agents.indices([x[1] for x in links])
+        order = _np.lexsort((trusted, trusters))
+        arrays['trust.indptr'] = _np.concatenate(([0], _np.cumsum(
+            _np.bincount(trusters, minlength=len(agents.symbols))))).astype(
+                _np.int64)
+        arrays['trust.trusted'] = trusted[order]
+        arrays['trust.values'] = _np.array([sn._tr[x] for x in links],
+                dtype=_np.float64)[order]
+        if trust:
+            real = agents.symbols[:size]
+            matrix = _np.zeros((size, size), dtype=_np.float64)
+            for i, x in enumerate(real):
+                # agents x cannot reach are not trusted at all
+                reached = sn.reachable(x)
+                for j, y in enumerate(real):
+                    if y in reached:
+                        matrix[i, j] = sn.trusts(x, y)
+            arrays['trust.matrix'] = matrix
+        arrays['sn.symbols'] = agents.pickled()
+        settings['agents'] = size
+        settings['operators'] = (sn._transitive_operator, sn._paths_operator)
+    if kb is not None:
+        symbols = _Symbols()
+        arrays['kb.predicates'] = symbols.indices(kb._predicates)
+        arrays['kb.rules'] = symbols.indices(kb._rules)
+        concluding = [(x, y) for x in kb._concluding for y in kb._concluding[x]]
+        arrays['kb.conclusions'] = symbols.indices([x for x, y in concluding])
+        arrays['kb.concluding'] = symbols.indices([y for x, y in concluding])
+        arrays['kb.symbols'] = symbols.pickled()
+    if af is not None:
+        symbols = _Symbols()
+        symbols.indices(af._Ar)
+        arrays['af.attackers'] = symbols.indices([x.attacker for x in af._df])
+        arrays['af.attacked'] = symbols.indices([x.attacked for x in af._df])
+        for name in semantics:
+            extensions = [list(x) for x in SEMANTICS[name](af)]
+            arrays['semantics.' + name] = symbols.indices(
+                    [y for x in extensions for y in x])
+            arrays['semantics.' + name + '.offsets'] = _np.cumsum(
+                    [0] + [len(x) for x in extensions], dtype=_np.int64)
+        arrays['af.symbols'] = symbols.pickled()
+        settings['arguments'] = len(symbols.symbols)
+
+    layout = dict()
+    offset = 0
+    for name, array in arrays.items():
+        offset += -offset % ALIGNMENT
+        layout[name] = (array.dtype.str, array.shape, offset)
+        offset += array.nbytes
+    header = _pickle.dumps({'layout': layout, 'settings': settings},
+            protocol=_pickle.HIGHEST_PROTOCOL)
+    start = _PREFIX.size + len(header)
+    start += -start % ALIGNMENT
+
+    with open(path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(start + layout[name][2])
+            f.write(array.tobytes())
+        f.truncate(start + offset)
+
+def load(path):
+    """
+    Reads a snapshot written by save and returns a Snapshot. The arrays of
+    the file are memory mapped, so that processes loading the same snapshot
+    share them, and are used as they are by the loaded objects. Missing
+    parts of the snapshot are None.
+    """
+    with open(path, 'rb') as f:
+        magic, version, length = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC or version != VERSION:
+            raise MalformedSnapshot("%s is not a version %d snapshot" %
+                    (path, VERSION))
+        header = _pickle.loads(f.read(length))
+        buf = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+    start = _PREFIX.size + length
+    start += -start % ALIGNMENT
+
+    settings = header['settings']
+    arrays = dict()
+    for name, (dtype, shape, offset) in header['layout'].items():
+        count = int(_np.prod(shape))
+        arrays[name] = _np.frombuffer(buf, dtype=dtype, count=count,
+                offset=start + offset).reshape(shape)
+
+    sn = kb = af = None
+    semantics = dict()
+    if settings['sn']:
+        sn = _MappedSocialNetwork(arrays['sn.symbols'], settings['agents'],
+                arrays['trust.indptr'],
+                arrays['trust.trusted'], arrays['trust.values'],
+                settings['operators'])
+        if 'trust.matrix' in arrays:
+            sn._trust_cache = _TrustMatrix(sn, arrays['trust.matrix'])
+    if settings['kb']:
+        kb = _MappedKnowledgeBase(arrays['kb.symbols'], arrays['kb.predicates'],
+                arrays['kb.rules'], arrays['kb.conclusions'],
+                arrays['kb.concluding'])
+    if settings['af']:
+        af = _MappedArgumentationFramework(arrays['af.symbols'],
+                settings['arguments'], arrays['af.attackers'],
+                arrays['af.attacked'])
+        semantics = _Semantics(af, arrays, settings['semantics'])
+    return Snapshot(sn, kb, af, semantics)
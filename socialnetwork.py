@@ -4,6 +4,13 @@ import pydot as _pydot
 
 # Trust = _namedtuple('Trust', ['truster', 'trusted'])
 
+def _ordered(agents):
+    """Returns agents sorted, by their repr if they are not comparable"""
+    try:
+        return sorted(agents)
+    except TypeError:
+        return sorted(agents, key=repr)
+
 class SocialNetwork:
     """
     A social network is a group of individuals, Ags, and the set of directed
@@ -31,12 +38,15 @@ class SocialNetwork:
         self._Ags = set(Ags)
         self._tau = {Trust(*x[:2]) for x in tau}
         self._tr  = dict()
+        self._trusted = dict() # truster -> agents it trusts directly
+        self._trust_cache = dict()
         for rel in tau:
             if rel[:2] in self._tr:
                 raise MalformedNetwork(
                         "Two values for the same relationship. %s -> %s" %
                         rel[:2])
             self._tr[rel[:2]] = rel[2]
+            self._trusted.setdefault(rel[0], []).append(rel[1])
 
     def __len__(self):
         return len(self._Ags)
@@ -44,6 +54,17 @@ class SocialNetwork:
     def __iter__(self):
         return iter(self._Ags)
 
+    def __contains__(self, agent):
+        return agent in self._Ags
+
+    def _links(self, source, closed):
+        """Returns the agents source trusts directly, except those in closed,
+        in a fixed order: closed is shared between the branches of
+        find_paths, so the paths found depend on the order links are
+        visited in"""
+        return _ordered({x for x in self._trusted.get(source, [])
+                if x not in closed})
+
     def find_paths(self, source, destination, closed=None):
         """Does a breadth first search to find all paths from source to
         destination
@@ -51,8 +72,7 @@ class SocialNetwork:
         if closed is None:
             closed = set()
         closed.add(source)
-        links = {x.trusted for x in self._tau
-                if x.truster == source and x.trusted not in closed}
+        links = self._links(source, closed)
         if len(links) == 0: # base
             return []
         if destination in links: # base
@@ -78,6 +98,8 @@ class SocialNetwork:
         to combine trust paths"""
         assert truster in self._Ags
         assert trustee in self._Ags
+        if (truster, trustee) in self._trust_cache:
+            return self._trust_cache[truster, trustee]
 
         trust = 0 # MIN TRUST TODO make this a constant for other modes of trust
         paths = self.find_paths(truster, trustee)
@@ -88,8 +110,21 @@ class SocialNetwork:
 
             trust = self._paths_operator(trust, path_trust)
 
+        self._trust_cache[truster, trustee] = trust
         return trust
 
+    def reachable(self, agent):
+        """Returns the set of agents that can be reached from agent by
+        following trust relations, agent included"""
+        retval = {agent}
+        pending = [agent]
+        while len(pending) != 0:
+            for trusted in self._trusted.get(pending.pop(), []):
+                if trusted not in retval:
+                    retval.add(trusted)
+                    pending.append(trusted)
+        return retval
+
     def agent_centric(self, agent):
         """Given an agent returns an agent centric graph.
 
@@ -98,6 +133,7 @@ class SocialNetwork:
         from the agent specified"""
         if agent not in self._Ags:
             raise ValueError("No such agent in social network")
-        Ags = [x for x in self._Ags if x == agent or len(self.find_paths(agent, x)) != 0]
+        Ags = self.reachable(agent).intersection(self._Ags)
         tau = [x + (self._tr[x],) for x in self._tau if x.truster in Ags and x.trusted in Ags]
-        return SocialNetwork(Ags, tau)
+        return SocialNetwork(Ags, tau, self._transitive_operator,
+                self._paths_operator)
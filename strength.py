@@ -0,0 +1,57 @@
+import numpy as _np
+from . import Attack
+
+# Strength of an argument without premises, and of a premise nobody believes
+MAX_STRENGTH = 1.0
+MIN_STRENGTH = 0.0
+
+def strengths(arguments, beliefs, trust):
+    """
+    Returns an array with the strength of every argument in arguments.
+
+    The strength of a premise (a Predicate or Rule) is the best belief in it,
+    where a belief counts for the lesser of its level and the trust in the
+    agent holding it. The strength of an argument is that of its weakest
+    premise (weakest link). Premises must be hashable, as in
+    CompactArguments.
+    Arguments:
+    --> arguments: Sequence of arguments
+    --> beliefs: Iterable of Beliefs
+    --> trust: Dictionary from agents to the trust in them, beliefs held by
+               other agents are ignored
+    """
+    columns = dict() # premise -> column
+    rows, cols = [], []
+    for i, argument in enumerate(arguments):
+        for premise in argument.predicates:
+            rows.append(i)
+            cols.append(columns.setdefault(premise, len(columns)))
+
+    believed, levels, trusts = [], [], []
+    for belief in beliefs:
+        column = columns.get(belief.predicate)
+        if column is not None and belief.agent in trust:
+            believed.append(column)
+            levels.append(belief.level)
+            trusts.append(trust[belief.agent])
+
+    premises = _np.full(len(columns), MIN_STRENGTH)
+    _np.maximum.at(premises, _np.array(believed, dtype=_np.intp),
+            _np.minimum(_np.array(levels, dtype=float),
+                _np.array(trusts, dtype=float)))
+    retval = _np.full(len(arguments), MAX_STRENGTH)
+    _np.minimum.at(retval, _np.array(rows, dtype=_np.intp),
+            premises[_np.array(cols, dtype=_np.intp)])
+    return retval
+
+def defeats(attacks, strength):
+    """
+    Returns the attacks that are defeats: an attack succeeds unless the
+    attacked argument is stronger than the attacker.
+    strength is a dictionary from arguments to their strength
+    """
+    attacks = list(attacks)
+    attackers = _np.array([strength[x.attacker] for x in attacks], dtype=float)
+    attacked = _np.array([strength[x.attacked] for x in attacks], dtype=float)
+    keep = attackers >= attacked
+    return {Attack(*x) for x, k in zip(attacks, keep) if k}
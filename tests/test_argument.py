@@ -0,0 +1,65 @@
+import pickle
+import sys
+import threading
+import unittest
+from argtrust import Predicate, Rule, Argument
+from argtrust.argument import CompactArgument
+from argtrust.framework import ArgumentationFramework
+
+class TestCompactArgument(unittest.TestCase):
+
+    def setUp(self):
+        self.a = Predicate('a', True)
+        self.b = Predicate('b', True)
+        self.c = Predicate('c', True)
+        self.fact_a = CompactArgument(self.a)
+        self.arg_b = CompactArgument(self.b, Rule([self.a], [self.b]),
+                [self.fact_a])
+        self.arg_c = CompactArgument(self.c, Rule([self.a, self.b], [self.c]),
+                [self.fact_a, self.arg_b])
+
+    def test_interned(self):
+        self.assertIs(CompactArgument(self.a), self.fact_a)
+        self.assertIs(CompactArgument(self.b, Rule((self.a,), (self.b,)),
+            (CompactArgument(self.a),)), self.arg_b)
+        self.assertIs(self.arg_c.subarguments[1], self.arg_b)
+        self.assertIs(pickle.loads(pickle.dumps(self.arg_c)), self.arg_c)
+        self.assertIsNot(CompactArgument(self.b), self.arg_b)
+
+    def test_interned_threads(self):
+        # Switch threads as often as possible to expose races
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        for trial in range(300):
+            predicate = Predicate('threaded%d' % trial, True)
+            barrier = threading.Barrier(8)
+            results = []
+            def build():
+                barrier.wait()
+                results.append(CompactArgument(predicate))
+            threads = [threading.Thread(target=build) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len({id(x) for x in results}), 1)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.fact_a.conclusion = self.b
+        with self.assertRaises(AttributeError):
+            self.fact_a.extra = None
+
+    def test_predicates(self):
+        self.assertEqual(self.fact_a.as_argument(), Argument([self.a], self.a))
+        self.assertEqual(self.arg_c.predicates, (Rule((self.a, self.b),
+            (self.c,)), self.a, Rule((self.a,), (self.b,)), self.a))
+
+    def test_framework(self):
+        af = ArgumentationFramework({self.fact_a, self.arg_b, self.arg_c},
+                {(self.arg_b, self.arg_c)})
+        self.assertEqual(af.grounded_extension(), {self.fact_a, self.arg_b})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import operator
+import unittest
+from argtrust import Belief, Predicate, Rule
+from argtrust.socialnetwork import SocialNetwork
+from argtrust.argument import CompactArgument
+from argtrust.beliefbase import BeliefBase
+
+class TestBeliefBase(unittest.TestCase):
+
+    def setUp(self):
+        self.a = Predicate('a', True)
+        self.b = Predicate('b', True)
+        self.nb = Predicate('b', False)
+        self.c = Predicate('c', True)
+
+        # A trusts B, B trusts C, nobody trusts D, E trusts C but has no
+        # beliefs
+        sn = SocialNetwork(['A', 'B', 'C', 'D', 'E'],
+                {('A', 'B', 0.8), ('B', 'C', 0.6), ('E', 'C', 0.5)})
+        beliefs = [Belief('A', Rule([self.a], [self.b]), 1.0),
+                Belief('B', self.a, 0.9),
+                Belief('C', self.nb, 0.7),
+                Belief('D', self.c, 1.0),
+                Belief('D', self.a, 1.0)]
+        self.bb0 = BeliefBase(sn, beliefs)
+
+    def test_indexes(self):
+        self.assertEqual(len(self.bb0.beliefs_of('D')), 2)
+        self.assertEqual(self.bb0.beliefs_of('E'), [])
+        self.assertEqual(len(self.bb0.believers(self.a)), 2)
+        self.assertEqual(len(self.bb0.believers(Rule((self.a,), (self.b,)))), 1)
+
+    def test_agent_view(self):
+        view = self.bb0.agent_view('A')
+        self.assertEqual(view.trust, {'A': 1.0, 'B': 0.8, 'C': 0.6})
+        self.assertIs(self.bb0.agent_view('A'), view)
+        self.assertEqual(self.bb0.agent_view('D').trust, {'D': 1.0})
+
+    def test_agent_view_operators(self):
+        sn = SocialNetwork(['A', 'B', 'C'], {('A', 'B', 0.5), ('B', 'C', 0.5)},
+                transitive_operator=operator.mul)
+        bb = BeliefBase(sn, [])
+        self.assertEqual(bb.agent_view('A').trust['C'], sn.trusts('A', 'C'))
+        self.assertEqual(bb.agent_view('A').trust['C'], 0.25)
+        with self.assertRaises(ValueError):
+            bb.agent_view('Z')
+
+    def test_agent_view_outsider(self):
+        sn = SocialNetwork(['A', 'B'], {('A', 'B', 0.5), ('B', 'Z', 1.0)})
+        bb = BeliefBase(sn, [Belief('Z', self.a, 1.0)])
+        self.assertEqual(bb.agent_view('A').trust, {'A': 1.0, 'B': 0.5})
+
+    def test_query(self):
+        af = self.bb0.query('A', self.b)
+        # a, b since a and not b, where the last two rebut each other
+        self.assertEqual(len(af), 3)
+        self.assertEqual(len(af._df), 2)
+        self.assertEqual(len(af.grounded_extension()), 1)
+        af = self.bb0.query('B', self.b)
+        self.assertEqual(len(af), 1)
+        self.assertEqual(len(self.bb0.query('D', self.b)), 0)
+
+    def test_strengths(self):
+        arguments = list(self.bb0.query('A', self.b))
+        strength = self.bb0.strengths('A', arguments)
+        # a is believed at 0.9 by B, who is trusted at 0.8
+        self.assertCountEqual(strength.values(), [0.8, 0.8, 0.6])
+        self.assertEqual(strength[CompactArgument(self.nb)], 0.6)
+
+    def test_query_preferences(self):
+        af = self.bb0.query('A', self.b, preferences=True)
+        # not b is weaker than b since a
+        self.assertEqual(len(af._df), 1)
+        self.assertEqual(len(af.grounded_extension()), 2)
+        self.assertNotIn(CompactArgument(self.nb), af.grounded_extension())
+
+    def test_gradual(self):
+        af = self.bb0.query('A', self.b)
+        scores = af.h_categorizer(self.bb0.strengths('A', af))
+        # not b (0.6) and b since a (0.8) attack each other
+        self.assertAlmostEqual(scores[CompactArgument(self.a)], 0.8)
+        self.assertGreater(scores[CompactArgument(self.b, Rule([self.a],
+            [self.b]), [CompactArgument(self.a)])],
+            scores[CompactArgument(self.nb)])
+
+    def test_query_many(self):
+        agents = ['A', 'B', 'C', 'D', 'E']
+        for preferences in [False, True]:
+            labellings = self.bb0.query_many(agents, [self.b], workers=2,
+                    preferences=preferences)
+            self.assertCountEqual(labellings, agents)
+            for agent in agents:
+                af = self.bb0.query(agent, self.b, preferences)
+                self.assertEqual(labellings[agent],
+                        af.get_labelling(af.grounded_extension()))
+        labellings = self.bb0.query_many(agents, [self.b], workers=2,
+                processes=True)
+        for agent in agents:
+            af = self.bb0.query(agent, self.b)
+            self.assertEqual(labellings[agent],
+                    af.get_labelling(af.grounded_extension()))
+        # Trust is propagated once per pair of agents
+        self.assertEqual(self.bb0._sn._trust_cache[('A', 'C')], 0.6)
+        # C and E only see not b
+        self.assertIs(self.bb0.agent_view('C').knowledgebase,
+                self.bb0.agent_view('E').knowledgebase)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,372 @@
+"""
+Differential tests: random small frameworks, networks and knowledge bases
+are run through the brute-force reference implementations and through the
+faster engines and modes, which must agree. Failing cases are shrunk to a
+minimal counterexample before being reported.
+
+Set ARGTRUST_DIFFERENTIAL_CASES to change the amount of cases per check.
+"""
+import operator
+import os
+import random
+import tempfile
+import time
+import unittest
+from argtrust import Belief, Predicate, Rule, Attack
+from argtrust.framework import ArgumentationFramework
+from argtrust.socialnetwork import SocialNetwork
+from argtrust.knowledgebase import KnowledgeBase, find_attacks, claims, complement
+from argtrust.beliefbase import BeliefBase
+from argtrust.snapshot import save, load
+
+CASES = int(os.environ.get('ARGTRUST_DIFFERENTIAL_CASES', 2000))
+
+# Transitive and paths operators of the generated networks
+OPERATORS = [(min, max), (operator.mul, max), (max, max)]
+
+# Generators, each case is a tuple of lists and of settings that are not
+# shrunk
+
+def random_framework(rng, size=6):
+    """Arguments and attacks of a random framework"""
+    Ar = list(range(rng.randint(0, size)))
+    df = [(x, y) for x in Ar for y in Ar if rng.random() < 0.25]
+    return (Ar, df)
+
+# Trusted in trust relations without being agents of the network
+OUTSIDERS = ['Z0', 'Z1']
+
+def random_network(rng, size=6):
+    """Agents, trust relations and operators of a random network"""
+    Ags = ['A%d' % i for i in range(rng.randint(1, size))]
+    tau = [(x, y, rng.choice([0.1, 0.3, 0.5, 0.7, 0.9, 1.0]))
+            for x in Ags for y in Ags + OUTSIDERS
+            if x != y and rng.random() < 0.3]
+    return (Ags, tau, rng.choice(OPERATORS))
+
+def random_beliefs(rng, size=5):
+    """Agents, trust relations, operators and beliefs of a random
+    BeliefBase"""
+    Ags, tau, operators = random_network(rng, size)
+    predicates = [Predicate(x, y) for x in 'abcd' for y in [True, False]]
+    beliefs = []
+    for agent in Ags:
+        for i in range(rng.randint(0, 3)):
+            if rng.random() < 0.5:
+                belief = rng.choice(predicates)
+            else:
+                belief = Rule(tuple(rng.sample(predicates, rng.randint(0, 2))),
+                        (rng.choice(predicates),))
+            beliefs.append(Belief(agent, belief, rng.choice([0.2, 0.6, 1.0])))
+    return (Ags, tau, operators, beliefs)
+
+# Shrinking, a smaller case drops one element of one of its lists
+
+def smaller(case):
+    for i, items in enumerate(case):
+        if type(items) is not list:
+            continue
+        for j in range(len(items)):
+            yield case[:i] + (items[:j] + items[j+1:],) + case[i+1:]
+
+def valid_framework(case):
+    Ar, df = case
+    return all(x in Ar and y in Ar for x, y in df)
+
+def valid_network(case):
+    Ags, tau = case[:2]
+    return len(Ags) != 0 and all(x in Ags and (y in Ags or y in OUTSIDERS)
+            for x, y, z in tau)
+
+# References, independent of the code under test
+
+def reference_paths(tau, source, destination, closed):
+    """The paths trust propagates along, as lists of agents: depth first
+    over the trusted agents in sorted order, agents visited once over all
+    branches and a direct link ending the search"""
+    closed.add(source)
+    links = sorted({y for x, y, z in tau if x == source and y not in closed})
+    if destination in links:
+        return [[source, destination]]
+    retval = []
+    for link in links:
+        retval += [[source] + x
+                for x in reference_paths(tau, link, destination, closed)]
+    return retval
+
+def reference_trust(tau, truster, trustee, operators):
+    """Trust of truster in trustee combined over reference_paths"""
+    transitive, paths = operators
+    values = {(x, y): z for x, y, z in tau}
+    trust = 0
+    for path in reference_paths(tau, truster, trustee, set()):
+        path_trust = 1.0
+        for link in zip(path, path[1:]):
+            path_trust = transitive(path_trust, values[link])
+        trust = paths(trust, path_trust)
+    return trust
+
+def reference_reachable(tau, agent):
+    """The agents reachable from agent, agent included"""
+    retval = {agent}
+    size = 0
+    while size != len(retval):
+        size = len(retval)
+        retval |= {y for x, y, z in tau if x in retval}
+    return retval
+
+def reference_view(Ags, tau, operators, beliefs, who):
+    """The agents who trusts mapped to the trust in them and the
+    KnowledgeBase of their beliefs"""
+    trust = {who: 1.0}
+    reachable = reference_reachable(tau, who)
+    for agent in Ags:
+        if agent != who and agent in reachable:
+            level = reference_trust(tau, who, agent, operators)
+            if level > 0:
+                trust[agent] = level
+    kb = KnowledgeBase(list({x.predicate: None for x in beliefs
+        if x.agent in trust}))
+    return trust, kb
+
+def reference_strengths(arguments, beliefs, trust):
+    """Weakest link strengths, one premise and belief at a time"""
+    retval = dict()
+    for argument in arguments:
+        strength = 1.0
+        for premise in argument.predicates:
+            strength = min(strength, max([min(x.level, trust[x.agent])
+                for x in beliefs if x.predicate == premise and
+                x.agent in trust] + [0.0]))
+        retval[argument] = strength
+    return retval
+
+def reference_attacks(arguments):
+    """Every pair of arguments compared by hand"""
+    return {Attack(x, y) for x in arguments for y in arguments
+            if complement(x.conclusion) in claims(y)}
+
+def shrink(case, fails, valid):
+    """Returns a minimal case, no smaller valid case of which fails"""
+    progress = True
+    while progress:
+        progress = False
+        for candidate in smaller(case):
+            if valid(candidate) and fails(candidate):
+                case = candidate
+                progress = True
+                break
+    return case
+
+
+class TestDifferential(unittest.TestCase):
+
+    def check(self, generate, valid, reference, candidate, seed=0):
+        """Runs CASES cases of generate through reference and candidate and
+        fails with a shrunk counterexample if any of them differ"""
+        rng = random.Random(seed)
+        def fails(case):
+            return reference(*case) != candidate(*case)
+        for i in range(CASES):
+            case = generate(rng)
+            if fails(case):
+                case = shrink(case, fails, valid)
+                self.fail("Counterexample %r: reference %r != candidate %r" %
+                        (case, reference(*case), candidate(*case)))
+
+    # Frameworks
+
+    def test_grounded_extension(self):
+        def reference(Ar, df):
+            # The grounded extension is the least complete extension
+            complete = ArgumentationFramework(Ar, df).complete_extension()
+            return set.intersection(*[set(x) for x in complete])
+        def candidate(Ar, df):
+            return ArgumentationFramework(Ar, df).grounded_extension()
+        self.check(random_framework, valid_framework, reference, candidate)
+
+    def test_framework_snapshot(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        def reference(Ar, df):
+            af = ArgumentationFramework(Ar, df)
+            return (af.complete_extension(), af.grounded_extension(),
+                    sorted(map(sorted, af.preferred_extension())),
+                    sorted(map(sorted, af.stable_extension())))
+        def candidate(Ar, df):
+            save(path, af=ArgumentationFramework(Ar, df))
+            return reference(load(path).framework._Ar, load(path).framework._df)
+        try:
+            self.check(random_framework, valid_framework, reference, candidate)
+        finally:
+            os.remove(path)
+
+    def test_gradual(self):
+        def reference(Ar, df):
+            # Plain python iteration of the h-categorizer and max-based
+            # equations
+            retval = []
+            af = ArgumentationFramework(Ar, df)
+            for aggregate in [sum, lambda x: max(x, default=0.0)]:
+                scores = {x: 1.0 for x in Ar}
+                for i in range(10000):
+                    new = {x: 1.0 / (1.0 + aggregate([scores[y]
+                        for y in af.minus(x)])) for x in Ar}
+                    if all(abs(new[x] - scores[x]) <= 1e-12 for x in Ar):
+                        break
+                    scores = new
+                retval.append({x: round(new[x], 6) for x in Ar})
+            return retval
+        def candidate(Ar, df):
+            af = ArgumentationFramework(Ar, df)
+            return [{x: round(y, 6) for x, y in scores.items()}
+                    for scores in [af.h_categorizer(tol=1e-12),
+                        af.max_based(tol=1e-12)]]
+        self.check(random_framework, valid_framework, reference, candidate)
+
+    # Networks
+
+    def test_trusts(self):
+        def reference(Ags, tau, operators):
+            return {(x, y): reference_trust(tau, x, y, operators)
+                    for x in Ags for y in Ags}
+        def candidate(Ags, tau, operators):
+            # Memoized, each pair is asked twice
+            sn = SocialNetwork(Ags, tau, *operators)
+            for x in Ags:
+                for y in Ags:
+                    sn.trusts(x, y)
+            return {(x, y): sn.trusts(x, y) for x in Ags for y in Ags}
+        self.check(random_network, valid_network, reference, candidate)
+
+    def test_network_snapshot(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        def reference(Ags, tau, operators):
+            return ({(x, y): reference_trust(tau, x, y, operators)
+                for x in Ags for y in Ags},
+                {x: reference_reachable(tau, x).intersection(Ags) for x in Ags})
+        def candidate(trust):
+            def candidate(Ags, tau, operators):
+                save(path, sn=SocialNetwork(Ags, tau, *operators), trust=trust)
+                sn = load(path).socialnetwork
+                return ({(x, y): sn.trusts(x, y) for x in Ags for y in Ags},
+                        {x: set(sn.agent_centric(x)) for x in Ags})
+            return candidate
+        try:
+            for trust in [False, True]:
+                self.check(random_network, valid_network, reference,
+                        candidate(trust))
+        finally:
+            os.remove(path)
+
+    def test_agent_centric(self):
+        def reference(Ags, tau, operators):
+            return {x: reference_reachable(tau, x).intersection(Ags)
+                    for x in Ags}
+        def candidate(Ags, tau, operators):
+            sn = SocialNetwork(Ags, tau, *operators)
+            return {x: set(sn.agent_centric(x)) for x in Ags}
+        self.check(random_network, valid_network, reference, candidate)
+
+    # Knowledge and belief bases
+
+    def test_find_attacks(self):
+        def reference(Ags, tau, operators, beliefs):
+            kb = KnowledgeBase([x.predicate for x in beliefs])
+            return reference_attacks(kb.closure_arguments())
+        def candidate(Ags, tau, operators, beliefs):
+            kb = KnowledgeBase([x.predicate for x in beliefs])
+            return find_attacks(kb.closure_arguments())
+        self.check(random_beliefs, valid_network, reference, candidate)
+
+    def test_agent_view(self):
+        def reference(Ags, tau, operators, beliefs):
+            retval = dict()
+            for agent in Ags:
+                trust, kb = reference_view(Ags, tau, operators, beliefs, agent)
+                retval[agent] = (trust, set(kb._predicates + kb._rules))
+            return retval
+        def candidate(Ags, tau, operators, beliefs):
+            bb = BeliefBase(SocialNetwork(Ags, tau, *operators), beliefs)
+            retval = dict()
+            for agent in Ags:
+                view = bb.agent_view(agent)
+                kb = view.knowledgebase
+                retval[agent] = (view.trust, set(kb._predicates + kb._rules))
+            return retval
+        self.check(random_beliefs, valid_network, reference, candidate)
+
+    def test_strengths(self):
+        def arguments(Ags, tau, operators, beliefs):
+            trust, kb = reference_view(Ags, tau, operators, beliefs, Ags[0])
+            return trust, sorted(kb.closure_arguments(), key=repr)
+        def reference(*case):
+            trust, args = arguments(*case)
+            strength = reference_strengths(args, case[3], trust)
+            return [strength[x] for x in args]
+        def candidate(*case):
+            trust, args = arguments(*case)
+            bb = BeliefBase(SocialNetwork(case[0], case[1], *case[2]), case[3])
+            strength = bb.strengths(case[0][0], args)
+            return [strength[x] for x in args]
+        self.check(random_beliefs, valid_network, reference, candidate)
+
+    def test_query_many(self):
+        queries = [Predicate('a', True), Predicate('b', False)]
+        conclusions = queries + [complement(x) for x in queries]
+        def reference(Ags, tau, operators, beliefs):
+            retval = dict()
+            for agent in Ags:
+                trust, kb = reference_view(Ags, tau, operators, beliefs, agent)
+                arguments = kb.closure_arguments(conclusions)
+                strength = reference_strengths(arguments, beliefs, trust)
+                af = ArgumentationFramework(arguments,
+                        {x for x in reference_attacks(arguments)
+                            if strength[x.attacker] >= strength[x.attacked]})
+                retval[agent] = af.get_labelling(af.grounded_extension())
+            return retval
+        def candidate(Ags, tau, operators, beliefs):
+            bb = BeliefBase(SocialNetwork(Ags, tau, *operators), beliefs)
+            return bb.query_many(Ags, queries, workers=4, preferences=True)
+        self.check(random_beliefs, valid_network, reference, candidate,
+                seed=1)
+
+    # Scale
+
+    def test_scale(self):
+        # A few hundred agents: trust and agent views have to stay
+        # polynomial, the references are only checked on a sample
+        rng = random.Random(2)
+        Ags = ['A%03d' % i for i in range(300)]
+        tau = {(rng.choice(Ags), rng.choice(Ags + OUTSIDERS))
+                for i in range(1500)}
+        tau = [(x, y, rng.choice([0.1, 0.5, 0.9])) for x, y in tau if x != y]
+        beliefs = [Belief(x, Predicate('a', rng.random() < 0.5), 1.0)
+                for x in Ags[::10]]
+        start = time.perf_counter()
+        bb = BeliefBase(SocialNetwork(Ags, tau), beliefs)
+        views = {x: bb.agent_view(x) for x in Ags[:5]}
+        for x in views:
+            bb.query(x, Predicate('a', True))
+        self.assertLess(time.perf_counter() - start, 30)
+        for x in Ags[:3]:
+            for y in rng.sample(Ags, 10):
+                level = reference_trust(tau, x, y, OPERATORS[0])
+                if x != y and level > 0:
+                    self.assertEqual(views[x].trust[y], level)
+                elif x != y:
+                    self.assertNotIn(y, views[x].trust)
+
+    # The harness itself
+
+    def test_shrink(self):
+        # Fails whenever there is a self attack
+        def fails(case):
+            return any(x == y for x, y in case[1])
+        case = shrink(([0, 1, 2], [(0, 1), (1, 1), (2, 0)]), fails,
+                valid_framework)
+        self.assertEqual(case, ([1], [(1, 1)]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -132,6 +132,36 @@ class TestArgumentationFramework(unittest.TestCase):
         self.assertCountEqual(self.fig2.stable_extension(), [])
         self.assertCountEqual(self.fig3.stable_extension(), [{'A'}, {'B'}])
 
+    def test_h_categorizer(self):
+        golden = (5 ** 0.5 - 1) / 2
+        self.assertEqual(self.fig0.h_categorizer(), {})
+        scores = self.fig1.h_categorizer()
+        self.assertAlmostEqual(scores['C'], 1.0)
+        self.assertAlmostEqual(scores['B'], 0.5)
+        self.assertAlmostEqual(scores['A'], 2 / 3)
+        scores = self.fig3.h_categorizer()
+        self.assertAlmostEqual(scores['A'], golden)
+        self.assertAlmostEqual(scores['B'], golden)
+        scores = self.fig6.h_categorizer()
+        self.assertAlmostEqual(scores['A'], golden)
+        self.assertAlmostEqual(scores['C'], 1 / (2 + golden))
+        scores = self.fig1.h_categorizer({'C': 0.5, 'B': 0.5})
+        self.assertAlmostEqual(scores['B'], 1 / 3)
+        self.assertAlmostEqual(scores['A'], 0.75)
+
+    def test_gradual_convergence(self):
+        with self.assertRaises(RuntimeError):
+            self.fig3.h_categorizer(max_iter=3)
+        scores = self.fig3.h_categorizer(tol=0.1, max_iter=3)
+        self.assertAlmostEqual(scores['A'], 0.6, 1)
+
+    def test_max_based(self):
+        scores = self.fig1.max_based()
+        self.assertAlmostEqual(scores['A'], 2 / 3)
+        scores = self.fig6.max_based()
+        self.assertAlmostEqual(scores['C'], 0.5)
+        self.assertAlmostEqual(scores['D'], 2 / 3)
+
 if __name__ == "__main__":
     unittest.main()
 
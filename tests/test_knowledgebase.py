@@ -0,0 +1,80 @@
+import unittest
+from argtrust import Predicate, Rule
+from argtrust.argument import CompactArgument
+from argtrust.knowledgebase import KnowledgeBase, find_attacks, freeze
+
+class TestKnowledgeBase(unittest.TestCase):
+
+    def setUp(self):
+        self.a = Predicate('a', True)
+        self.b = Predicate('b', True)
+        self.c = Predicate('c', True)
+        self.d = Predicate('d', True)
+
+        # Two ways to b, two ways to c, so four ways to d
+        self.r1 = Rule([self.a], [self.b])
+        self.r2 = Rule([], [self.b])
+        self.r3 = Rule([self.a], [self.c])
+        self.r4 = Rule([self.b], [self.c])
+        self.r5 = Rule([self.b, self.c], [self.d])
+        self.kb0 = KnowledgeBase([self.a, self.r1, self.r2, self.r3, self.r4,
+            self.r5])
+
+        # Circular
+        self.r6 = Rule([self.c], [self.b])
+        self.r7 = Rule([self.b], [self.c])
+        self.kb1 = KnowledgeBase([self.r6, self.r7])
+
+        # a, but not c since a; e unless not b
+        self.nc = Predicate('c', False)
+        self.nb = Predicate('b', False)
+        self.e = Predicate('e', True)
+        self.r8 = Rule([self.a], [self.nc])
+        self.r9 = Rule([self.b], [self.e])
+        self.kb2 = KnowledgeBase([self.a, self.nb, self.c, self.r8, self.r9])
+
+    def test_iter_arguments(self):
+        arguments = list(self.kb0.iter_arguments(self.b))
+        self.assertEqual(len(arguments), 2)
+        self.assertCountEqual([x.predicates for x in arguments],
+                [[self.r1, self.a], [self.r2]])
+        self.assertEqual(len(list(self.kb0.iter_arguments(self.c))), 3)
+        self.assertEqual(len(list(self.kb0.iter_arguments(self.d))), 6)
+        self.assertEqual(list(self.kb0.iter_arguments(self.a)),
+                [([self.a], self.a)])
+
+    def test_iter_arguments_cycle(self):
+        self.assertEqual(list(self.kb1.iter_arguments(self.b)), [])
+
+    def test_iter_arguments_bounds(self):
+        self.assertEqual(len(list(self.kb0.iter_arguments(self.d, limit=2))), 2)
+        self.assertEqual(list(self.kb0.iter_arguments(self.b, max_depth=0)), [])
+        self.assertEqual(len(list(self.kb0.iter_arguments(self.c, max_depth=1))), 1)
+        self.assertEqual(len(list(self.kb0.iter_arguments(self.c, max_depth=2))), 3)
+
+    def test_find_attacks(self):
+        fact_c = freeze(next(self.kb2.iter_arguments(self.c)))
+        not_c = freeze(next(self.kb2.iter_arguments(self.nc)))
+        not_b = freeze(next(self.kb2.iter_arguments(self.nb)))
+        d = freeze(next(self.kb0.iter_arguments(self.d)))
+        self.assertEqual(find_attacks([fact_c, not_c]),
+                {(fact_c, not_c), (not_c, fact_c)})
+        # not b undercuts every argument that relies on b
+        self.assertEqual(find_attacks([not_b, d]), {(not_b, d)})
+
+    def test_argumentation_framework(self):
+        af = self.kb2.argumentation_framework([self.e])
+        # e is only constructible from b, which kb2 lacks
+        self.assertEqual(len(af), 0)
+        af = self.kb2.argumentation_framework([self.c])
+        # c, not c since a and its sub-argument a
+        self.assertEqual(len(af), 3)
+        self.assertEqual(af.grounded_extension(),
+                {CompactArgument(self.a)})
+        self.assertEqual(len(af.preferred_extension()), 2)
+        af = self.kb0.argumentation_framework()
+        self.assertEqual(len(af), len(set(af)))
+        self.assertEqual(len(af._df), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from argtrust import Belief, Predicate, Rule
+from argtrust.socialnetwork import SocialNetwork
+from argtrust.server import QueryServer, benchmark, read_beliefs
+
+class TestQueryServer(unittest.TestCase):
+
+    def setUp(self):
+        a = Predicate('a', True)
+        b = Predicate('b', True)
+        self.sn = SocialNetwork(['A', 'B', 'C'],
+                {('A', 'B', 0.8), ('B', 'C', 0.6)})
+        self.beliefs = [Belief('A', Rule([a], [b]), 1.0),
+                Belief('B', a, 0.9),
+                Belief('C', Predicate('b', False), 0.7)]
+        self.requests = [
+                {'op': 'trust', 'truster': 'A', 'trustee': 'C'},
+                {'op': 'query', 'agent': 'A', 'query': ['b', True]},
+                {'op': 'query', 'agent': 'A', 'query': ['b', True],
+                    'preferences': True},
+                {'op': 'extension', 'agent': 'A', 'query': ['b', True],
+                    'semantics': 'preferred'}]
+
+    def test_handle(self):
+        async def run():
+            server = QueryServer(self.sn, self.beliefs)
+            answers = await asyncio.gather(
+                    *[server.handle(x) for x in self.requests * 3])
+            return server, answers
+        server, answers = asyncio.run(run())
+        # Identical concurrent requests are computed once
+        self.assertEqual(server.computations, len(self.requests))
+        self.assertEqual(answers[0], 0.6)
+        self.assertEqual(len(answers[1]['in']), 1)
+        self.assertEqual(len(answers[1]['undecided']), 2)
+        self.assertEqual(len(answers[2]['in']), 2)
+        self.assertEqual(len(answers[3]), 2)
+        self.assertEqual(answers[:4], answers[4:8])
+
+    def test_errors(self):
+        async def run():
+            server = QueryServer(self.sn, self.beliefs)
+            with self.assertRaisesRegex(ValueError, "Unknown op nonsense"):
+                await server.handle({'op': 'nonsense'})
+            with self.assertRaisesRegex(ValueError, "No such agent"):
+                await server.handle({'op': 'trust', 'truster': 'A',
+                    'trustee': 'Z'})
+            await server.close()
+            return server
+        server = asyncio.run(run())
+        with self.assertRaises(RuntimeError):
+            server._executor.submit(print)
+
+    def test_processes(self):
+        async def run():
+            server = QueryServer(self.sn, self.beliefs, processes=True)
+            try:
+                return await asyncio.gather(
+                        *[server.handle(x) for x in self.requests])
+            finally:
+                await server.close()
+        threads = QueryServer(self.sn, self.beliefs)
+        self.assertEqual(asyncio.run(run()),
+                [threads.compute(x) for x in self.requests])
+
+    def test_executor(self):
+        with ProcessPoolExecutor() as executor:
+            with self.assertRaises(TypeError):
+                QueryServer(self.sn, self.beliefs, executor)
+
+    def test_read_beliefs(self):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            json.dump([['A', {'predicates': [['a', True]],
+                'conclusions': [['b', True]]}, 1.0], ['B', ['a', True], 0.9],
+                ['C', ['b', False], 0.7]], f)
+        try:
+            beliefs = read_beliefs(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(beliefs[1:], self.beliefs[1:])
+        self.assertEqual(beliefs[0].predicate, Rule((Predicate('a', True),),
+            (Predicate('b', True),)))
+
+    def test_load(self):
+        stats = benchmark(self.sn, self.beliefs, self.requests * 5 +
+                [{'op': 'nonsense'}], concurrency=3)
+        self.assertEqual(stats['requests'], 21)
+        self.assertEqual(stats['errors'], 1)
+        self.assertTrue(stats['p50'] <= stats['p99'] <= stats['max'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import random
+import tempfile
+import unittest
+from argtrust import Predicate, Rule
+from argtrust.socialnetwork import SocialNetwork
+from argtrust.knowledgebase import KnowledgeBase
+from argtrust.snapshot import save, load, MalformedSnapshot
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.sn = SocialNetwork(['A', 'B', 'C', 'D'], {('A', 'B', 0.5),
+            ('A', 'C', 0.8), ('B', 'D', 0.4), ('C', 'D', 0.7)})
+        a = Predicate('a', True)
+        b = Predicate('b', True)
+        self.kb = KnowledgeBase([a, Predicate('b', False), Rule([a], [b])])
+        self.af = self.kb.argumentation_framework()
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        save(self.path, self.sn, self.kb, self.af, trust=True,
+                semantics=['grounded', 'preferred'])
+        snapshot = load(self.path)
+        sn = snapshot.socialnetwork
+        self.assertEqual(sn._Ags, self.sn._Ags)
+        self.assertEqual(sn._tau, self.sn._tau)
+        self.assertEqual(sn._tr, self.sn._tr)
+        self.assertEqual(sn.trusts('A', 'D'), 0.7)
+        self.assertEqual(sn.agent_centric('B')._Ags, {'B', 'D'})
+        kb = snapshot.knowledgebase
+        self.assertEqual(kb._predicates, self.kb._predicates)
+        self.assertEqual(kb._concluding, self.kb._concluding)
+        self.assertEqual(kb.argumentation_framework()._Ar, self.af._Ar)
+        self.assertEqual(list(kb.iter_arguments(Predicate('b', True))),
+                list(self.kb.iter_arguments(Predicate('b', True))))
+        af = snapshot.framework
+        self.assertEqual(af._Ar, self.af._Ar)
+        self.assertEqual(af._df, self.af._df)
+        self.assertEqual(snapshot.semantics['grounded'],
+                [self.af.grounded_extension()])
+        self.assertCountEqual(snapshot.semantics['preferred'],
+                self.af.preferred_extension())
+
+    def test_mapped_network(self):
+        sn = SocialNetwork(['A', 'B', 'C', 'D', 'E'], {('A', 'B', 0.5),
+            ('A', 'C', 0.8), ('B', 'D', 0.4), ('C', 'D', 0.7), ('D', 'Z', 1.0)},
+            transitive_operator=max)
+        save(self.path, sn)
+        loaded = load(self.path).socialnetwork
+        # Nothing is built until needed
+        self.assertNotIn('_agents', vars(loaded))
+        self.assertEqual(len(loaded), 5)
+        self.assertIn('E', loaded)
+        self.assertNotIn('Z', loaded)
+        self.assertEqual(loaded._Ags, sn._Ags)
+        self.assertEqual(loaded._tau, sn._tau)
+        self.assertEqual(dict(loaded._tr), sn._tr)
+        self.assertEqual(loaded.reachable('A'), sn.reachable('A'))
+        self.assertEqual(loaded.agent_centric('B')._tr,
+                sn.agent_centric('B')._tr)
+        for x in sn:
+            for y in sn:
+                self.assertEqual(loaded.trusts(x, y), sn.trusts(x, y))
+
+    def test_lazy_load(self):
+        rng = random.Random(0)
+        agents = list(range(5000))
+        tau = {(rng.randrange(5000), rng.randrange(5000)) for i in range(50000)}
+        tau = [(x, y, rng.random()) for x, y in tau]
+        sn = SocialNetwork(agents, tau)
+        save(self.path, sn, self.kb, self.af)
+        snapshot = load(self.path)
+        # Loading maps the arrays and builds no objects from them
+        self.assertEqual(vars(snapshot.socialnetwork).keys() & {'_agents',
+            '_ids', '_Ags', '_tr', '_tau', '_trusted'}, set())
+        self.assertEqual(vars(snapshot.knowledgebase).keys() & {'_symbols',
+            '_predicates', '_rules', '_concluding', '_given'}, set())
+        self.assertEqual(vars(snapshot.framework).keys() & {'_symbols', '_Ar',
+            '_df'}, set())
+        self.assertEqual(snapshot.socialnetwork.reachable(0), sn.reachable(0))
+
+    def test_partial(self):
+        save(self.path, sn=self.sn)
+        snapshot = load(self.path)
+        self.assertIsNone(snapshot.knowledgebase)
+        self.assertIsNone(snapshot.framework)
+        self.assertEqual(snapshot.socialnetwork.trusts('A', 'D'), 0.7)
+
+    def test_malformed(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * 64)
+        with self.assertRaises(MalformedSnapshot):
+            load(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
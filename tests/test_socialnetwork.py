@@ -27,6 +27,14 @@ class TestSocialNetwork(unittest.TestCase):
     def test_agent_centric(self):
         tmpsn = self.sn5.agent_centric('A')
         self.assertCountEqual(tmpsn._Ags, ['A', 'B'])
+        sn = SocialNetwork(['A', 'B', 'C'], {('A', 'B', 0.5), ('B', 'C', 0.8)},
+                transitive_operator=lambda x, y: x * y)
+        self.assertAlmostEqual(sn.agent_centric('A').trusts('A', 'C'), 0.4)
+
+    def test_reachable(self):
+        self.assertEqual(self.sn3.reachable('A'), {'A', 'B', 'C'})
+        self.assertEqual(self.sn3.reachable('B'), {'B', 'C'})
+        self.assertEqual(self.sn5.reachable('C'), {'C'})
 
     def test_find_paths(self):
         self.assertEqual(len(self.sn4.find_paths('A', 'D')), 2)